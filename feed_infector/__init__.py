@@ -0,0 +1,23 @@
+"""Generate short TikTok-style lyric videos from songs, SRT or LRC lyrics and background clips.
+
+Plan jobs with ``plan_random_jobs`` / ``plan_per_song_jobs`` (or build a ``Job``
+by hand) and hand them to ``render`` or ``render_many``. moviepy is only
+imported once a render actually starts.
+"""
+from .jobs import Job, RenderResult, load_job, save_job
+from .offload import OutputOffloader
+from .planning import plan_job, plan_per_song_jobs, plan_random_jobs
+from .rendering import render, render_many
+
+__all__ = [
+    "Job",
+    "OutputOffloader",
+    "RenderResult",
+    "load_job",
+    "plan_job",
+    "plan_per_song_jobs",
+    "plan_random_jobs",
+    "render",
+    "render_many",
+    "save_job",
+]
@@ -0,0 +1,225 @@
+import functools
+import os
+import random
+import re
+
+from .config import (
+    LYRICS_FOLDER, SONGS_FOLDER, BACKGROUNDS_FOLDER, FONTS_FOLDER,
+    RANDOM_CAPTIONS_FONTS_FOLDER, RANDOM_CAPTIONS_FILE,
+    FONT_EXTENSIONS, SONG_EXTENSIONS, BACKGROUND_EXTENSIONS, LYRICS_EXTENSIONS,
+)
+
+
+def _list_fonts(folder):
+    fonts = []
+    if os.path.exists(folder):
+        for file in os.listdir(folder):
+            if file.lower().endswith(FONT_EXTENSIONS):
+                fonts.append(os.path.join(folder, file))
+    return fonts if fonts else ['Arial']  # Fallback to Arial if no fonts found
+
+def get_available_fonts():
+    """Get list of available font files"""
+    return _list_fonts(FONTS_FOLDER)
+
+def get_random_caption_fonts():
+    """Get list of available random caption font files"""
+    return _list_fonts(RANDOM_CAPTIONS_FONTS_FOLDER)
+
+def get_random_captions():
+    """Read random captions from file"""
+    if not os.path.exists(RANDOM_CAPTIONS_FILE):
+        print(f"WARNING: {RANDOM_CAPTIONS_FILE} not found. Creating sample file...")
+        # Create a sample file with some example captions
+        sample_captions = [
+            "🔥 This hits different 🔥",
+            "When the beat drops just right ✨",
+            "POV: You found your new favorite song",
+            "This song lives rent-free in my head 🎵",
+            "The vibes are immaculate ✨",
+            "Main character energy 💫",
+            "This is pure art 🎨",
+            "When music becomes emotion 💭",
+            "The perfect soundtrack to life 🌟",
+            "This deserves more recognition 👑"
+        ]
+        with open(RANDOM_CAPTIONS_FILE, 'w', encoding='utf-8') as f:
+            for caption in sample_captions:
+                f.write(caption + '\n')
+        print(f"Created sample {RANDOM_CAPTIONS_FILE} with example captions")
+
+    try:
+        with open(RANDOM_CAPTIONS_FILE, 'r', encoding='utf-8') as f:
+            captions = [line.strip() for line in f.readlines() if line.strip()]
+        return captions
+    except Exception as e:
+        print(f"Error reading {RANDOM_CAPTIONS_FILE}: {e}")
+        return []
+
+def pick_random_font():
+    """Select a random font from available fonts"""
+    fonts = get_available_fonts()
+    return random.choice(fonts)
+
+def pick_random_caption_font():
+    """Select a random font from available caption fonts"""
+    fonts = get_random_caption_fonts()
+    return random.choice(fonts)
+
+def pick_random_caption():
+    """Select a random caption from the captions file"""
+    captions = get_random_captions()
+    if not captions:
+        return None
+    return random.choice(captions)
+
+# Inline word timestamps used by enhanced SRT and enhanced LRC: <mm:ss.xx> or <hh:mm:ss,mmm>
+WORD_TAG_PATTERN = re.compile(r'<((?:\d{1,2}:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)>')
+LRC_LAST_LINE_DURATION = 5  # seconds, LRC has no end time for the final line
+
+def time_to_seconds(time_str):
+    parts = [float(p) for p in time_str.replace(',', '.').split(':')]
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+def parse_word_tags(text, start_time, end_time):
+    """Strip inline word timestamps from a lyric line.
+
+    Returns the clean text and a list of timed words, or None for the words if
+    the line has no timestamps. Each word ends where the next one starts; the
+    last one ends with the line.
+    """
+    if not WORD_TAG_PATTERN.search(text):
+        return text, None
+
+    words = []
+    word_start = start_time
+    for i, chunk in enumerate(WORD_TAG_PATTERN.split(text)):
+        if i % 2 == 1:
+            word_start = time_to_seconds(chunk)
+            continue
+        for word in chunk.split():
+            words.append({'text': word, 'start_time': word_start, 'end_time': None})
+    for word, next_word in zip(words, words[1:] + [None]):
+        word['end_time'] = next_word['start_time'] if next_word else end_time
+        word['end_time'] = max(word['end_time'], word['start_time'])
+
+    clean_lines = [' '.join(line.split()) for line in WORD_TAG_PATTERN.sub('', text).splitlines()]
+    return '\n'.join(line for line in clean_lines if line), words
+
+def parse_srt_file(srt_file):
+    with open(srt_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    pattern = r'(?m)^\s*(\d+)\s+(\d{2}:\d{2}:\d{2},\d{3})\s+-->\s+(\d{2}:\d{2}:\d{2},\d{3})\s+([\s\S]*?)(?=\n\s*\n\s*\d+|$)'
+    matches = re.findall(pattern, content)
+    subtitle_entries = []
+    for match in matches:
+        index, start_time_str, end_time_str, text = match
+        start_time = time_to_seconds(start_time_str)
+        end_time = time_to_seconds(end_time_str)
+        text, words = parse_word_tags(text.strip(), start_time, end_time)
+        entry = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'text': text
+        }
+        if words:
+            entry['words'] = words
+        subtitle_entries.append(entry)
+    return subtitle_entries
+
+def parse_lrc_file(lrc_file):
+    """Parse an (optionally enhanced) LRC file into the same entries as parse_srt_file"""
+    with open(lrc_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    timed_lines = []
+    for line in content.splitlines():
+        # A line can carry several timestamps when it repeats, e.g. a chorus
+        tags = re.findall(r'\[(\d{1,2}:\d{2}(?:[.:]\d{1,3})?)\]', line)
+        text = re.sub(r'\[[^\]]*\]', '', line).strip()
+        for tag in tags:
+            minutes, seconds = tag.split(':', 1)
+            timed_lines.append((float(minutes) * 60 + float(seconds.replace(':', '.')), text))
+    timed_lines.sort(key=lambda item: item[0])
+
+    subtitle_entries = []
+    for i, (start_time, text) in enumerate(timed_lines):
+        end_time = timed_lines[i + 1][0] if i + 1 < len(timed_lines) else start_time + LRC_LAST_LINE_DURATION
+        text, words = parse_word_tags(text, start_time, end_time)
+        if not text:
+            continue  # blank timestamp lines only mark the end of the previous line
+        entry = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'text': text
+        }
+        if words:
+            entry['words'] = words
+        subtitle_entries.append(entry)
+    return subtitle_entries
+
+def parse_lyrics_file(lyrics_file):
+    """Parse an .srt or .lrc lyrics file"""
+    if lyrics_file.lower().endswith(".lrc"):
+        return parse_lrc_file(lyrics_file)
+    return parse_srt_file(lyrics_file)
+
+def get_available_songs():
+    """Get list of available songs with their base names"""
+    songs = []
+    for f in os.listdir(SONGS_FOLDER):
+        if f.lower().endswith(SONG_EXTENSIONS):
+            base_name = os.path.splitext(f)[0]
+            for extension in LYRICS_EXTENSIONS:
+                lyrics_file = os.path.join(LYRICS_FOLDER, base_name + extension)
+                if os.path.exists(lyrics_file):
+                    songs.append({
+                        'file': f,
+                        'base_name': base_name,
+                        'lyrics_file': lyrics_file
+                    })
+                    break
+    return songs
+
+def pick_random_background():
+    backgrounds = [f for f in os.listdir(BACKGROUNDS_FOLDER) if f.lower().endswith(BACKGROUND_EXTENSIONS)]
+    if not backgrounds:
+        print("DEBUG: no background videos found")
+        return None
+    return random.choice(backgrounds)
+
+@functools.lru_cache(maxsize=None)
+def _probe_video(video_path, mtime, size):
+    from pydub.utils import mediainfo_json
+    info = mediainfo_json(video_path)
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            duration = stream.get('duration') or info.get('format', {}).get('duration')
+            return {
+                'width': int(stream['width']),
+                'height': int(stream['height']),
+                'duration': float(duration) if duration else None
+            }
+    return None
+
+def get_video_info(video_path):
+    """Get the frame size and duration of a video file, or None if it can't be probed"""
+    try:
+        stat = os.stat(video_path)
+        return _probe_video(video_path, stat.st_mtime, stat.st_size)
+    except Exception as e:
+        print(f"DEBUG: could not probe {video_path}: {e}")
+        return None
+
+def get_audio_duration(audio_path):
+    """Get duration of an audio file in seconds without decoding it"""
+    from pydub.utils import mediainfo
+    return float(mediainfo(audio_path)['duration'])
+
+def load_segment_audio(audio_path, start_time, end_time):
+    """Decode an audio file and cut out the given segment"""
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(audio_path)
+    return audio[int(start_time * 1000):int(end_time * 1000)]
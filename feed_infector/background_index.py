@@ -0,0 +1,156 @@
+import math
+import os
+import random
+import subprocess
+
+from .config import BACKGROUNDS_FOLDER, BACKGROUND_EXTENSIONS
+
+# Backgrounds are sampled as tiny grayscale frames; that's plenty for
+# brightness / motion / cut statistics and keeps ingest fast.
+INDEX_SUFFIX = ".qidx.npz"
+SAMPLE_FPS = 4
+SAMPLE_SIZE = (64, 36)  # width, height
+
+DARK_LUMA = 20          # mean luminance below this is treated as a black frame
+BRIGHT_LUMA = 245       # ... and above this as a white flash
+FADE_SLOPE = 12         # luminance change per second that counts as a fade
+STATIC_MOTION = 0.5     # mean abs frame difference below this is a frozen shot
+CUT_MIN_DIFF = 30       # a cut needs at least this frame difference ...
+CUT_FACTOR = 4          # ... and this many times the clip's median difference
+GOOD_WINDOW = 0.8       # minimum window score for a start to be considered good
+
+# Fallback when a background has no index: skip intros of long clips
+LEGACY_SKIP = 4
+LEGACY_SKIP_MIN_DURATION = 35
+
+
+def index_path_for(background_path):
+    return background_path + INDEX_SUFFIX
+
+def _ffmpeg_exe():
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        return get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+def sample_frames(background_path, sample_fps=SAMPLE_FPS, size=SAMPLE_SIZE):
+    """Decode a background as small grayscale frames, shape (n_frames, height, width)"""
+    import numpy as np
+    w, h = size
+    proc = subprocess.run([
+        _ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-i', background_path,
+        '-vf', f'fps={sample_fps},scale={w}:{h}', '-an',
+        '-f', 'rawvideo', '-pix_fmt', 'gray', '-'
+    ], capture_output=True, check=True)
+    frames = np.frombuffer(proc.stdout, dtype=np.uint8)
+    return frames[:len(frames) // (w * h) * (w * h)].reshape(-1, h, w)
+
+def compute_scores(frames, sample_fps=SAMPLE_FPS):
+    """Per-second luminance, motion and scene-cut flags for sampled frames"""
+    import numpy as np
+    seconds = len(frames) // sample_fps
+    frames = frames[:seconds * sample_fps].astype(np.int16)
+
+    frame_luma = frames.mean(axis=(1, 2))
+    frame_diff = np.zeros(len(frames))
+    if len(frames) > 1:
+        frame_diff[1:] = np.abs(frames[1:] - frames[:-1]).mean(axis=(1, 2))
+
+    cut_threshold = max(CUT_MIN_DIFF, CUT_FACTOR * float(np.median(frame_diff))) if len(frames) else CUT_MIN_DIFF
+    luma = frame_luma.reshape(seconds, sample_fps).mean(axis=1)
+    motion = frame_diff.reshape(seconds, sample_fps).mean(axis=1)
+    cut = (frame_diff > cut_threshold).reshape(seconds, sample_fps).any(axis=1)
+    return {
+        'luma': np.round(luma).astype(np.uint8),
+        'motion': motion.astype(np.float16),
+        'cut': cut,
+    }
+
+def build_background_index(background_path):
+    """Sample a background and store its per-second scores next to it"""
+    import numpy as np
+    scores = compute_scores(sample_frames(background_path))
+    stat = os.stat(background_path)
+    path = index_path_for(background_path)
+    np.savez_compressed(
+        path,
+        src_size=stat.st_size,
+        src_mtime=stat.st_mtime,
+        **scores
+    )
+    return path
+
+def load_background_index(background_path):
+    """Load the stored scores for a background, or None if missing or stale"""
+    path = index_path_for(background_path)
+    if not os.path.exists(path):
+        return None
+    import numpy as np
+    with np.load(path) as data:
+        stat = os.stat(background_path)
+        if int(data['src_size']) != stat.st_size or float(data['src_mtime']) != stat.st_mtime:
+            print(f"DEBUG: quality index for {background_path} is stale, ignoring it")
+            return None
+        return {key: data[key] for key in ('luma', 'motion', 'cut')}
+
+def index_backgrounds(force=False):
+    """Build quality indexes for every background that doesn't have a fresh one"""
+    built = []
+    for f in sorted(os.listdir(BACKGROUNDS_FOLDER)):
+        if not f.lower().endswith(BACKGROUND_EXTENSIONS):
+            continue
+        background_path = os.path.join(BACKGROUNDS_FOLDER, f)
+        if not force and load_background_index(background_path) is not None:
+            continue
+        try:
+            build_background_index(background_path)
+            built.append(background_path)
+            print(f"✓ Indexed: {background_path}")
+        except Exception as e:
+            print(f"✗ Failed to index {background_path}: {e}")
+    return built
+
+def window_scores(index, window):
+    """Score every whole-second start for a window of ``window`` seconds (0 = unusable, 1 = clean)"""
+    import numpy as np
+    luma = index['luma'].astype(np.float32)
+    motion = index['motion'].astype(np.float32)
+
+    quality = np.ones(len(luma), dtype=np.float32)
+    if len(luma) > 1:
+        quality[np.abs(np.gradient(luma)) > FADE_SLOPE] *= 0.25
+    quality[motion < STATIC_MOTION] *= 0.5
+    quality[(luma < DARK_LUMA) | (luma > BRIGHT_LUMA) | index['cut']] = 0
+
+    n_starts = len(quality) - window + 1
+    if n_starts <= 0:
+        return np.zeros(0, dtype=np.float32)
+    cumulative = np.concatenate(([0], np.cumsum(quality)))
+    unusable = np.concatenate(([0], np.cumsum(quality == 0)))
+    # Fades and static shots only lower the mean, but a black frame, a flash or
+    # a cut anywhere in the window rules it out, however good the rest is
+    scores = (cumulative[window:] - cumulative[:-window]) / window
+    scores[unusable[window:] - unusable[:-window] > 0] = 0
+    return scores
+
+def pick_background_start(background_path, clip_duration, segment_duration, rng=random):
+    """Pick where in the background the segment starts.
+
+    Uses the quality index when there is one, drawing only from windows that
+    score well; otherwise falls back to a uniform pick that skips the intro
+    of long clips.
+    """
+    max_start = max(0, clip_duration - segment_duration)
+    index = load_background_index(background_path)
+    if index is not None:
+        import numpy as np
+        scores = window_scores(index, math.ceil(segment_duration))[:int(max_start) + 1]
+        if len(scores) and scores.max() > 0:
+            threshold = min(GOOD_WINDOW, float(np.quantile(scores[scores > 0], 0.8)))
+            candidates = np.flatnonzero(scores >= threshold)
+            return float(min(rng.choice(candidates.tolist()), max_start))
+        print(f"DEBUG: no good window in {background_path}, picking a random start")
+
+    offset = min(LEGACY_SKIP, max_start) if clip_duration > LEGACY_SKIP_MIN_DURATION else 0
+    return rng.uniform(offset, max_start)
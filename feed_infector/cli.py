@@ -0,0 +1,141 @@
+import argparse
+import os
+
+from .assets import get_available_fonts, get_available_songs, get_random_caption_fonts, get_random_captions
+from .background_index import index_backgrounds
+from .config import DURATION, DRAFTS_FOLDER, OUTPUT_FOLDER, ensure_folders
+from .jobs import load_job
+from .planning import parse_duration_arg, plan_per_song_jobs, plan_random_jobs
+from .rendering import render_many
+
+
+def print_job_plan(job, draft=False):
+    """Print everything that was decided for a job"""
+    print(f"PLAN: song {job.song}")
+    print(f"PLAN: segment {job.start_time:.1f}s to {job.end_time:.1f}s ({len(job.segment_lyrics)} lyric lines)")
+    start = f" from {job.background_start:.1f}s" if job.background_start is not None else ""
+    print(f"PLAN: background {job.background}{start}")
+    print(f"PLAN: lyrics font {job.lyrics_font}{' (karaoke)' if job.karaoke else ''}")
+    if job.caption is not None:
+        print(f"PLAN: caption '{job.caption}' with font {job.caption_font}")
+    print(f"PLAN: seed {job.seed}")
+    root = DRAFTS_FOLDER if draft else OUTPUT_FOLDER
+    print(f"PLAN: output folder {job.output_dir or os.path.join(root, job.base_name)}{' (draft)' if draft else ''}")
+
+def load_promoted_jobs(paths):
+    """Load the saved job specs for approved drafts (the draft video or its .json)"""
+    jobs = []
+    for path in paths:
+        spec_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.exists(spec_path):
+            print(f"No job spec found for {path}, skipping...")
+            continue
+        jobs.append(load_job(spec_path))
+    return jobs
+
+def run_jobs(jobs, threads, workers=1, dry_run=False, draft=False, copy_workers=2):
+    """Print the plan for each job, or render them and report the results"""
+    if not jobs:
+        return []
+    if dry_run:
+        for i, job in enumerate(jobs):
+            print(f"\nJob {i + 1} of {len(jobs)}")
+            print_job_plan(job, draft)
+        return []
+
+    results = render_many(jobs, workers=workers, threads=threads, draft=draft, copy_workers=copy_workers)
+    for result in results:
+        if result.ok and result.draft:
+            print(f"✓ Created draft: {result.output_path} ({result.timings['total']:.1f}s, spec {result.spec_path})")
+        elif result.ok:
+            print(f"✓ Created: {result.output_path} ({result.timings['total']:.1f}s)")
+        else:
+            print(f"✗ Failed to create video: {result.error}")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate videos with subtitles and song snippets using GPU acceleration.")
+    parser.add_argument("--duration", type=str, default=str(DURATION), help="Duration of each video segment in seconds (single number or range like '12-20')")
+    parser.add_argument("--threads", type=int, default=1, help="Number of threads to use for video generation")
+    parser.add_argument("--workers", type=int, default=1, help="Number of videos to render in parallel worker processes")
+    parser.add_argument("--copy-workers", type=int, default=2, help="Number of background threads moving finished videos from scratch to the output folder")
+    parser.add_argument("--random-cap", action="store_true", help="Add random captions at the top of videos")
+    parser.add_argument("--dry-run", action="store_true", help="Print the job plan without rendering any video")
+    parser.add_argument("--karaoke", action="store_true", help="Highlight lyrics word by word (uses word timestamps from enhanced SRT/LRC when present)")
+    parser.add_argument("--draft", action="store_true", help=f"Render low-resolution previews into {DRAFTS_FOLDER}/ and save their job specs")
+
+    # Mutually exclusive group for generation mode
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--random", type=int, help="Generate N random videos from random songs")
+    group.add_argument("--per-song", type=int, help="Generate N videos for each available song")
+    group.add_argument("--index-backgrounds", action="store_true", help="Build quality indexes for backgrounds that are missing or out of date, then exit")
+    group.add_argument("--promote", nargs="+", metavar="DRAFT", help="Re-render approved drafts at full quality from their saved job specs")
+
+    args = parser.parse_args(argv)
+
+    ensure_folders()
+
+    if args.index_backgrounds:
+        built = index_backgrounds()
+        print(f"Indexed {len(built)} backgrounds")
+        return
+
+    if args.promote:
+        jobs = load_promoted_jobs(args.promote)
+        print(f"\n=== Promoting {len(jobs)} drafts to full quality ===")
+        run_jobs(jobs, args.threads, args.workers, args.dry_run, copy_workers=args.copy_workers)
+        return
+
+    # Parse duration argument
+    duration_range = parse_duration_arg(args.duration)
+    min_dur, max_dur = duration_range
+
+    if min_dur == max_dur:
+        print(f"Using fixed duration: {min_dur} seconds")
+    else:
+        print(f"Using random duration range: {min_dur}-{max_dur} seconds")
+
+    # Get available songs
+    songs = get_available_songs()
+    if not songs:
+        print("No songs with matching lyrics (.srt or .lrc) files found!")
+        return
+
+    print(f"Found {len(songs)} songs with lyrics:")
+    for song in songs:
+        print(f"  - {song['base_name']}")
+
+    # List available fonts
+    fonts = get_available_fonts()
+    print(f"\nFound {len(fonts)} fonts available for random selection")
+
+    # Check random captions setup if requested
+    if args.random_cap:
+        captions = get_random_captions()
+        caption_fonts = get_random_caption_fonts()
+        print(f"Random captions enabled: {len(captions)} captions, {len(caption_fonts)} caption fonts")
+
+    jobs = []
+    if args.random:
+        print(f"\n=== Generating {args.random} random videos ===")
+        jobs = plan_random_jobs(args.random, duration_range, args.random_cap, args.karaoke)
+
+    elif args.per_song:
+        print(f"\n=== Generating {args.per_song} videos per song ({len(songs) * args.per_song} total) ===")
+        jobs = plan_per_song_jobs(songs, args.per_song, duration_range, args.random_cap, args.karaoke)
+
+    run_jobs(jobs, args.threads, args.workers, args.dry_run, args.draft, args.copy_workers)
+
+def legacy_main(argv=None):
+    """Entry point for the original run.py interface (`--num N`)"""
+    parser = argparse.ArgumentParser(description="Generate random videos with subtitles and a song snippet.")
+    parser.add_argument("--num", type=int, default=1, help="Number of videos to generate")
+    parser.add_argument("--duration", type=int, default=DURATION, help="Duration of each video segment in seconds")
+    parser.add_argument("--threads", type=int, default=1, help="Number of threads to use for video generation")
+    parser.add_argument("--dry-run", action="store_true", help="Print the job plan without rendering any video")
+    args = parser.parse_args(argv)
+
+    ensure_folders()
+
+    jobs = plan_random_jobs(args.num, (args.duration, args.duration))
+    run_jobs(jobs, args.threads, dry_run=args.dry_run)
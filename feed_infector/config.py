@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+
+LYRICS_FOLDER = "lyrics"
+SONGS_FOLDER = "songs"
+BACKGROUNDS_FOLDER = "background"
+FONTS_FOLDER = "fonts"
+RANDOM_CAPTIONS_FONTS_FOLDER = "random_captions_fonts"
+OUTPUT_FOLDER = "output_videos"
+DRAFTS_FOLDER = "draft_videos"
+# Renders are written here first and moved into OUTPUT_FOLDER once complete,
+# so point it at fast local disk when the output folder is a network share
+SCRATCH_FOLDER = os.environ.get("FEED_INFECTOR_SCRATCH", os.path.join(tempfile.gettempdir(), "feed_infector"))
+RANDOM_CAPTIONS_FILE = "random_captions.txt"
+HISTORY_FILE = "render_history.jsonl"  # per-render features and stage timings for the cost model
+DURATION = 15  # seconds
+
+VIDEO_SIZE = (1080, 1920)
+VIDEO_FPS = 24
+# Drafts render the same job at a third of the resolution and half the frame rate
+DRAFT_SCALE = 1 / 3
+DRAFT_FPS = 12
+DRAFT_CODEC = ('libx264', ["-preset", "ultrafast", "-tune", "fastdecode", "-crf", "30"])
+
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+SONG_EXTENSIONS = (".mp3", ".wav")
+BACKGROUND_EXTENSIONS = (".mp4", ".mov", ".avi")
+LYRICS_EXTENSIONS = (".srt", ".lrc")  # in order of preference
+
+
+def ensure_folders():
+    """Create the asset and output folders if they don't exist"""
+    for folder in [LYRICS_FOLDER, SONGS_FOLDER, BACKGROUNDS_FOLDER, FONTS_FOLDER, RANDOM_CAPTIONS_FONTS_FOLDER, OUTPUT_FOLDER, DRAFTS_FOLDER]:
+        os.makedirs(folder, exist_ok=True)
@@ -0,0 +1,127 @@
+import heapq
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+
+from .assets import get_video_info
+from .config import BACKGROUNDS_FOLDER, HISTORY_FILE
+
+MIN_HISTORY = 8        # successful renders needed before the fitted model is trusted
+HISTORY_WINDOW = 500   # only the most recent renders are used for fitting
+RIDGE = 1e-3           # keeps the fit stable when some features never vary
+SOFTWARE_ENCODERS = ('libx264', 'libx265')
+
+
+def job_features(job, encoder, draft=False):
+    """The job properties that drive render cost"""
+    info = get_video_info(os.path.join(BACKGROUNDS_FOLDER, job.background))
+    return {
+        'duration': job.duration,
+        'megapixels': info['width'] * info['height'] / 1e6 if info else 2.07,  # assume 1080p when unknown
+        'lyric_lines': len(job.segment_lyrics),
+        'caption': int(job.caption is not None),
+        'karaoke': int(job.karaoke),
+        'draft': int(draft),
+        'software_encoder': int(encoder in SOFTWARE_ENCODERS),
+    }
+
+def _design_row(features):
+    # Most of the work scales with the number of frames, so the per-frame
+    # factors are multiplied by the segment duration
+    d = features['duration']
+    return [
+        1.0,
+        d,
+        d * features['megapixels'],
+        d * features['software_encoder'],
+        d * features['karaoke'],
+        d * features['draft'],
+        features['lyric_lines'],
+        features['caption'],
+    ]
+
+def record_history(results, features, history_file=HISTORY_FILE):
+    """Append the features and stage timings of finished renders to the history file"""
+    timestamp = datetime.now().isoformat(timespec='seconds')
+    with open(history_file, 'a', encoding='utf-8') as f:
+        for result, job_feature in zip(results, features):
+            f.write(json.dumps({
+                'time': timestamp,
+                'ok': result.ok,
+                'features': job_feature,
+                'timings': {stage: round(seconds, 3) for stage, seconds in result.timings.items()},
+            }) + '\n')
+
+def load_history(history_file=HISTORY_FILE):
+    """Successful renders from the history file, most recent last"""
+    if not os.path.exists(history_file):
+        return []
+    rows = []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # tolerate a half-written last line
+            if row.get('ok') and 'total' in row.get('timings', {}):
+                rows.append(row)
+    return rows[-HISTORY_WINDOW:]
+
+
+class CostModel:
+    """Predicts render seconds from job features, fitted on past renders.
+
+    With too little history it falls back to a heuristic that is only good for
+    ranking jobs, not for absolute times; ``fitted`` tells the two apart.
+    """
+
+    def __init__(self, coefficients=None):
+        self.coefficients = coefficients
+
+    @property
+    def fitted(self):
+        return self.coefficients is not None
+
+    @classmethod
+    def from_history(cls, history_file=HISTORY_FILE):
+        rows = load_history(history_file)
+        if len(rows) < MIN_HISTORY:
+            return cls()
+        import numpy as np
+        try:
+            X = np.array([_design_row(row['features']) for row in rows], dtype=float)
+        except KeyError:
+            return cls()  # history from an older feature set
+        y = np.array([row['timings']['total'] for row in rows], dtype=float)
+        # Ridge regression: (X'X + aI) b = X'y
+        gram = X.T @ X
+        gram += RIDGE * np.trace(gram) / len(gram) * np.eye(len(gram))
+        return cls(np.linalg.solve(gram, X.T @ y).tolist())
+
+    def predict(self, features):
+        if not self.fitted:
+            return features['duration'] * (1 + features['megapixels']) * (0.3 if features['draft'] else 1)
+        row = _design_row(features)
+        return max(0.1, sum(c * x for c, x in zip(self.coefficients, row)))
+
+
+@dataclass
+class Schedule:
+    order: List[int]            # job indices, longest predicted first
+    predictions: List[float]    # predicted seconds per job, in the original job order
+    predicted_makespan: float   # finish time of the busiest worker if predictions hold
+    fitted: bool
+
+def plan_schedule(predictions, workers, fitted=True):
+    """Longest-predicted-first order and the makespan it gives on ``workers`` workers.
+
+    Workers pull the next job as soon as they are free, so submitting jobs in
+    this order makes the pool behave like greedy LPT bin packing.
+    """
+    order = sorted(range(len(predictions)), key=lambda i: predictions[i], reverse=True)
+    loads = [0.0] * max(1, workers)
+    for i in order:
+        heapq.heappush(loads, heapq.heappop(loads) + predictions[i])
+    return Schedule(order=order, predictions=list(predictions), predicted_makespan=max(loads), fitted=fitted)
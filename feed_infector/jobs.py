@@ -0,0 +1,65 @@
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class Job:
+    """Everything needed to render one video, decided up front by the planner"""
+    song: str                   # file name inside SONGS_FOLDER
+    base_name: str
+    audio_path: str
+    start_time: float           # segment start within the song, in seconds
+    end_time: float
+    segment_lyrics: List[dict]  # parsed lyric entries overlapping the segment
+    background: str             # file name inside BACKGROUNDS_FOLDER
+    lyrics_font: str
+    caption: Optional[str] = None
+    caption_font: Optional[str] = None
+    output_dir: Optional[str] = None  # defaults to OUTPUT_FOLDER/<base_name> (DRAFTS_FOLDER for drafts)
+    seed: Optional[int] = None  # drives render-time randomness such as the background start
+    karaoke: bool = False       # highlight lyrics word by word
+    background_start: Optional[float] = None  # seconds into the background; drawn from the seed when None
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+def save_job(job, path):
+    """Write a job spec to a JSON file so it can be rendered again later"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(job.to_dict(), f, ensure_ascii=False, indent=2)
+
+def load_job(path):
+    """Read a job spec written by save_job"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return Job.from_dict(json.load(f))
+
+
+@dataclass
+class RenderResult:
+    """Outcome of rendering a single Job"""
+    job: Job
+    output_path: Optional[str] = None  # final destination; may still be copying when offloaded
+    timings: Dict[str, float] = field(default_factory=dict)  # seconds per stage, plus 'total'
+    error: Optional[str] = None
+    draft: bool = False
+    spec_path: Optional[str] = None  # saved job spec, written next to drafts
+    scratch_path: Optional[str] = None  # where the video was rendered before being finalized
+    predicted_seconds: Optional[float] = None  # cost model estimate used for scheduling
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def segment(self):
+        return self.job.start_time, self.job.end_time
@@ -0,0 +1,115 @@
+import functools
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+TEXT_COLOR = (255, 255, 255)
+HIGHLIGHT_COLOR = (255, 214, 0)
+STROKE_COLOR = (0, 0, 0)
+LINE_SPACING = 1.15
+
+
+def word_timings(entry):
+    """(start, end) in song time for each word of a lyric entry.
+
+    Uses the entry's own word timestamps when the lyrics file has them,
+    otherwise spreads the words evenly across the entry's span.
+    """
+    words = entry['text'].split()
+    timed = entry.get('words')
+    if timed and len(timed) == len(words):
+        return [(w['start_time'], w['end_time']) for w in timed]
+
+    if not words:
+        return []
+    step = (entry['end_time'] - entry['start_time']) / len(words)
+    return [(entry['start_time'] + i * step, entry['start_time'] + (i + 1) * step) for i in range(len(words))]
+
+
+@dataclass(frozen=True)
+class GlyphAtlas:
+    """A lyric rasterized once in both colours, plus where each word landed"""
+    base: Any                       # (h, w, 3) uint8, text in TEXT_COLOR
+    highlight: Any                  # (h, w, 3) uint8, same text in HIGHLIGHT_COLOR
+    alpha: Any                      # (h, w) float32 mask, shared by both layers
+    word_boxes: List[Tuple[int, int, int, int]]  # (x0, x1, y0, y1) per word, in reading order
+
+
+def _load_font(font, font_size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype(font, font_size)
+    except OSError:
+        print(f"DEBUG: Karaoke font error with {font}, falling back to the default font")
+        return ImageFont.load_default(size=font_size)
+
+@functools.lru_cache(maxsize=256)
+def build_atlas(text, font, font_size, stroke_width):
+    """Rasterize a (possibly multi-line) lyric once and record where each word is"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    pil_font = _load_font(font, font_size)
+    ascent, descent = pil_font.getmetrics()
+    line_height = int((ascent + descent) * LINE_SPACING)
+    lines = [line.split() for line in text.splitlines() if line.split()]
+    measure = ImageDraw.Draw(Image.new('L', (1, 1)))
+    space = measure.textlength(' ', font=pil_font)
+
+    pad = stroke_width + 2
+    line_widths = [measure.textlength(' '.join(words), font=pil_font) for words in lines]
+    width = int(max(line_widths, default=1)) + 2 * pad
+    height = line_height * len(lines) + 2 * pad
+
+    layers = []
+    word_boxes = []
+    for color in (TEXT_COLOR, HIGHLIGHT_COLOR):
+        image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        for line_index, words in enumerate(lines):
+            x = pad + (width - 2 * pad - line_widths[line_index]) / 2  # centre each line
+            y = pad + line_index * line_height
+            for word in words:
+                word_width = measure.textlength(word, font=pil_font)
+                draw.text((x, y), word, font=pil_font, fill=color,
+                          stroke_width=stroke_width, stroke_fill=STROKE_COLOR)
+                if color == TEXT_COLOR:
+                    word_boxes.append((int(x) - stroke_width, int(x + word_width) + stroke_width + 1,
+                                       y, y + line_height))
+                x += word_width + space
+        layers.append(np.asarray(image))
+
+    base, highlight = layers
+    return GlyphAtlas(
+        base=np.ascontiguousarray(base[:, :, :3]),
+        highlight=np.ascontiguousarray(highlight[:, :, :3]),
+        alpha=base[:, :, 3].astype(np.float32) / 255,
+        word_boxes=word_boxes,
+    )
+
+def karaoke_frame(atlas, timings, t):
+    """Frame of a karaoke line at line-relative time ``t``: sung words in the highlight colour.
+
+    Words are highlighted left to right, the current word partially, so each
+    frame is one copy of the base layer plus a slice per sung word.
+    """
+    frame = atlas.base.copy()
+    for (x0, x1, y0, y1), (start, end) in zip(atlas.word_boxes, timings):
+        if t < start:
+            break
+        if t < end and end > start:
+            x1 = x0 + int((x1 - x0) * (t - start) / (end - start))
+        frame[y0:y1, x0:x1] = atlas.highlight[y0:y1, x0:x1]
+    return frame
+
+def make_karaoke_clip(entry, segment_start_time, start, end, font, font_size, stroke_width):
+    """Build a moviepy clip showing ``entry`` from ``start`` to ``end`` (video time) with word highlighting"""
+    from moviepy import ImageClip, VideoClip
+
+    atlas = build_atlas(entry['text'], font, font_size, stroke_width)
+    # Word times relative to the clip's own start
+    offset = segment_start_time + start
+    timings = [(word_start - offset, word_end - offset) for word_start, word_end in word_timings(entry)]
+
+    mask = ImageClip(atlas.alpha, is_mask=True).with_duration(end - start)
+    clip = VideoClip(frame_function=lambda t: karaoke_frame(atlas, timings, t), duration=end - start)
+    return clip.with_mask(mask).with_start(start).with_end(end)
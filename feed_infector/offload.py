@@ -0,0 +1,90 @@
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PARTIAL_SUFFIX = ".partial"
+
+
+def finalize_output(src, dest):
+    """Move a finished render from scratch to its destination atomically.
+
+    Downstream tools only ever see ``dest`` once it is complete: on the same
+    filesystem this is a single rename, otherwise the file is copied to
+    ``dest + PARTIAL_SUFFIX`` first and renamed into place.
+    """
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    try:
+        os.replace(src, dest)
+        return dest
+    except OSError:
+        pass  # different filesystem, fall back to copy + rename
+
+    partial = dest + PARTIAL_SUFFIX
+    try:
+        shutil.copyfile(src, partial)
+        os.replace(partial, dest)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.remove(src)
+    return dest
+
+
+class OutputOffloader:
+    """Background thread pool that finalizes renders while the next one starts.
+
+    At most ``max_pending`` files may be waiting or copying at once; ``submit``
+    blocks beyond that, so a slow output share throttles rendering instead of
+    filling up the scratch disk.
+    """
+
+    def __init__(self, max_workers=2, max_pending=4):
+        max_workers = max(1, max_workers)
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="offload")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, src, dest, result=None):
+        """Queue ``src`` to be finalized at ``dest``; returns a Future for ``dest``.
+
+        If a RenderResult is given, its timings get an 'offload' entry and a
+        failed copy is recorded as its error. ``src`` is removed either way.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._finalize, src, dest, result)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _finalize(self, src, dest, result):
+        start = time.perf_counter()
+        try:
+            return finalize_output(src, dest)
+        except Exception as e:
+            if result is not None:
+                result.error = f"offload failed: {type(e).__name__}: {e}"
+                result.output_path = None
+                if result.spec_path and os.path.exists(result.spec_path):
+                    os.remove(result.spec_path)  # don't leave a promotable spec without its draft
+                result.spec_path = None
+            if os.path.exists(src):
+                os.remove(src)  # nothing retries a failed copy, so don't fill up the scratch disk
+            raise
+        finally:
+            if result is not None:
+                result.timings['offload'] = time.perf_counter() - start
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
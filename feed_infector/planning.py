@@ -0,0 +1,170 @@
+import os
+import random
+from dataclasses import replace
+
+from .assets import (
+    get_audio_duration, get_available_songs, get_video_info, parse_lyrics_file, pick_random_background,
+    pick_random_caption, pick_random_caption_font, pick_random_font,
+)
+from .background_index import pick_background_start
+from .config import BACKGROUNDS_FOLDER, DURATION, SONGS_FOLDER
+from .jobs import Job
+
+
+def parse_duration_arg(duration_str):
+    """Parse duration argument - can be single number or range like '12-20'"""
+    if isinstance(duration_str, int):
+        return duration_str, duration_str  # Single duration
+
+    duration_str = str(duration_str)
+    if '-' in duration_str:
+        try:
+            min_dur, max_dur = map(int, duration_str.split('-'))
+            if min_dur > max_dur:
+                min_dur, max_dur = max_dur, min_dur  # Swap if reversed
+            return min_dur, max_dur
+        except ValueError:
+            print(f"Invalid duration range format: {duration_str}. Using default {DURATION}s")
+            return DURATION, DURATION
+    else:
+        try:
+            dur = int(duration_str)
+            return dur, dur
+        except ValueError:
+            print(f"Invalid duration format: {duration_str}. Using default {DURATION}s")
+            return DURATION, DURATION
+
+def get_random_duration(min_dur, max_dur):
+    """Get a random duration between min and max (inclusive)"""
+    if min_dur == max_dur:
+        return min_dur
+    return random.randint(min_dur, max_dur)
+
+def pick_song_segment(song_info, duration_range=(DURATION, DURATION)):
+    """Pick a segment from a specific song"""
+    # Get actual duration for this segment
+    min_dur, max_dur = duration_range
+    duration = get_random_duration(min_dur, max_dur)
+
+    subtitles = parse_lyrics_file(song_info['lyrics_file'])
+    if not subtitles:
+        print(f"DEBUG: lyrics file has no entries for {song_info['base_name']}")
+        return None
+
+    audio_path = os.path.join(SONGS_FOLDER, song_info['file'])
+    full_duration = get_audio_duration(audio_path)
+
+    possible_entries = [entry for entry in subtitles if entry['start_time'] <= (full_duration - duration)]
+    if not possible_entries:
+        print(f"DEBUG: no suitable lyric entries for a {duration}s segment in {song_info['base_name']}")
+        return None
+
+    selected_entry = random.choice(possible_entries)
+    start_time = selected_entry['start_time']
+    end_time = min(start_time + duration, full_duration)
+
+    # Gather lyrics
+    segment_lyrics = []
+    for entry in subtitles:
+        if entry['end_time'] > start_time and entry['start_time'] < end_time:
+            segment_lyrics.append(entry)
+
+    return {
+        'song': song_info['file'],
+        'base_name': song_info['base_name'],
+        'audio_path': audio_path,
+        'segment_lyrics': segment_lyrics,
+        'start_time': start_time,
+        'end_time': end_time,
+        'actual_duration': duration
+    }
+
+def pick_random_song_segment(duration_range=(DURATION, DURATION)):
+    """Pick a random song segment"""
+    songs = get_available_songs()
+    if not songs:
+        print("DEBUG: no songs found")
+        return None
+
+    selected_song = random.choice(songs)
+    return pick_song_segment(selected_song, duration_range)
+
+def plan_job(song_segment, use_random_caption=False, karaoke=False):
+    """Pick background, fonts and caption for a song segment without rendering anything"""
+    background_file = pick_random_background()
+    if not background_file:
+        return None
+
+    caption = None
+    caption_font = None
+    if use_random_caption:
+        caption = pick_random_caption()
+        caption_font = pick_random_caption_font()
+
+    return resolve_background_start(Job(
+        song=song_segment['song'],
+        base_name=song_segment['base_name'],
+        audio_path=song_segment['audio_path'],
+        start_time=song_segment['start_time'],
+        end_time=song_segment['end_time'],
+        segment_lyrics=song_segment['segment_lyrics'],
+        background=background_file,
+        lyrics_font=pick_random_font(),
+        caption=caption,
+        caption_font=caption_font,
+        seed=random.randrange(2 ** 32),
+        karaoke=karaoke
+    ))
+
+def resolve_background_start(job):
+    """Fix where the background starts so every render of the job uses the same frames.
+
+    The start is drawn from the job's seed once and stored on the job, so a
+    background index built (or a clip touched) later can't move it. Jobs whose
+    background can't be probed are returned unchanged and pick at render time.
+    """
+    if job.background_start is not None:
+        return job
+    background_path = os.path.join(BACKGROUNDS_FOLDER, job.background)
+    info = get_video_info(background_path)
+    if not info or not info['duration']:
+        return job
+    rng = random.Random(job.seed) if job.seed is not None else random
+    return replace(job, background_start=pick_background_start(background_path, info['duration'], job.duration, rng))
+
+def plan_random_jobs(num_videos, duration_range, use_random_caption=False, karaoke=False):
+    """Plan jobs for random segments of random songs"""
+    jobs = []
+    for i in range(num_videos):
+        song_segment = pick_random_song_segment(duration_range)
+        if not song_segment:
+            print("Could not generate random segment, skipping...")
+            continue
+
+        print(f"DEBUG: video {i + 1} of {num_videos}: {song_segment['song']} "
+              f"{song_segment['start_time']:.1f}s to {song_segment['end_time']:.1f}s (duration: {song_segment['actual_duration']}s)")
+        job = plan_job(song_segment, use_random_caption, karaoke)
+        if not job:
+            print("No background videos found, skipping...")
+            continue
+        jobs.append(job)
+    return jobs
+
+def plan_per_song_jobs(songs, videos_per_song, duration_range, use_random_caption=False, karaoke=False):
+    """Plan a specific number of jobs for each song"""
+    jobs = []
+    for song_info in songs:
+        for i in range(videos_per_song):
+            song_segment = pick_song_segment(song_info, duration_range)
+            if not song_segment:
+                print(f"Could not generate segment for {song_info['base_name']}, skipping...")
+                continue
+
+            print(f"DEBUG: {song_info['base_name']} video {i + 1} of {videos_per_song}: "
+                  f"{song_segment['start_time']:.1f}s to {song_segment['end_time']:.1f}s (duration: {song_segment['actual_duration']}s)")
+            job = plan_job(song_segment, use_random_caption, karaoke)
+            if not job:
+                print("No background videos found, skipping...")
+                continue
+            jobs.append(job)
+    return jobs
@@ -0,0 +1,464 @@
+import functools
+import glob
+import os
+import random
+import subprocess
+import tempfile
+import time
+import traceback
+from datetime import datetime
+
+from .assets import load_segment_audio, pick_random_caption_font, pick_random_font
+from .background_index import pick_background_start
+from .cost_model import MIN_HISTORY, CostModel, job_features, plan_schedule, record_history
+from .config import (
+    BACKGROUNDS_FOLDER, OUTPUT_FOLDER, DRAFTS_FOLDER, SCRATCH_FOLDER, HISTORY_FILE,
+    VIDEO_SIZE, VIDEO_FPS, DRAFT_SCALE, DRAFT_FPS, DRAFT_CODEC,
+)
+from .jobs import RenderResult, save_job
+from .karaoke import make_karaoke_clip
+from .offload import PARTIAL_SUFFIX, OutputOffloader, finalize_output
+from .planning import resolve_background_start
+
+
+@functools.lru_cache(maxsize=None)
+def detect_gpu_codec():
+    """Detect available GPU codec and return appropriate parameters (probed once per process)"""
+    # Test for NVIDIA GPU (most reliable method)
+    try:
+        result = subprocess.run(['nvidia-smi'], capture_output=True, text=True, timeout=5)
+        if result.returncode == 0:
+            # Double-check that NVENC is actually available
+            try:
+                test_result = subprocess.run([
+                    'ffmpeg', '-hide_banner', '-f', 'lavfi', '-i', 'testsrc=duration=1:size=320x240:rate=1',
+                    '-c:v', 'h264_nvenc', '-f', 'null', '-'
+                ], capture_output=True, text=True, timeout=10)
+                if test_result.returncode == 0:
+                    print("DEBUG: NVIDIA GPU detected and NVENC available")
+                    return 'h264_nvenc', ["-preset", "p4", "-cq", "23", "-b:v", "0"]
+            except:
+                pass
+    except:
+        pass
+
+    # Test for AMD GPU
+    try:
+        result = subprocess.run(['rocm-smi'], capture_output=True, text=True, timeout=5)
+        if result.returncode == 0:
+            # Test if AMF encoder actually works
+            try:
+                test_result = subprocess.run([
+                    'ffmpeg', '-hide_banner', '-f', 'lavfi', '-i', 'testsrc=duration=1:size=320x240:rate=1',
+                    '-c:v', 'h264_amf', '-f', 'null', '-'
+                ], capture_output=True, text=True, timeout=10)
+                if test_result.returncode == 0:
+                    print("DEBUG: AMD GPU detected and AMF available")
+                    return 'h264_amf', ["-quality", "speed", "-rc", "cqp", "-qp", "23"]
+            except:
+                pass
+    except:
+        pass
+
+    # Test for Intel GPU with actual functionality test
+    try:
+        # First check if Intel GPU device exists
+        intel_gpu_check = subprocess.run(['lspci'], capture_output=True, text=True, timeout=5)
+        if 'Intel' in intel_gpu_check.stdout and ('VGA' in intel_gpu_check.stdout or 'Display' in intel_gpu_check.stdout):
+            # Test if QSV encoder actually works
+            test_result = subprocess.run([
+                'ffmpeg', '-hide_banner', '-f', 'lavfi', '-i', 'testsrc=duration=1:size=320x240:rate=1',
+                '-c:v', 'h264_qsv', '-f', 'null', '-'
+            ], capture_output=True, text=True, timeout=10)
+            if test_result.returncode == 0:
+                print("DEBUG: Intel GPU detected and QSV available")
+                return 'h264_qsv', ["-preset", "fast", "-global_quality", "23"]
+    except:
+        pass
+
+    # Fallback to CPU with optimized settings
+    print("DEBUG: No GPU acceleration available, using optimized CPU encoding")
+    return 'libx264', ["-preset", "ultrafast", "-crf", "23"]
+
+def create_video(background_path, audio_segment, lyrics_data, output_path, segment_start_time, threads=1, lyrics_font=None, random_caption=None, caption_font=None, rng=None, draft=False, karaoke=False, background_start=None):
+    """Compose and encode one video, returning the time spent per stage in seconds.
+
+    The background starts at ``background_start`` seconds, or at a start drawn
+    with ``rng`` when that is None; ``draft`` renders the same layout at
+    DRAFT_SCALE / DRAFT_FPS; ``karaoke`` highlights each lyric word by word
+    instead of showing it whole.
+    """
+    # Heavy imports are deferred until a video is actually rendered
+    import numpy as np
+    from moviepy import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, vfx
+
+    rng = rng or random
+    # Everything positional or size-related is scaled so drafts match the full render
+    ui_scale = DRAFT_SCALE if draft else 1
+    fps = DRAFT_FPS if draft else VIDEO_FPS
+
+    # Get GPU codec settings (drafts always use the fastest software preset)
+    video_codec, ffmpeg_params = DRAFT_CODEC if draft else detect_gpu_codec()
+    ffmpeg_params = list(ffmpeg_params)  # don't let the encoder mutate the cached list
+
+    # Fonts and caption are normally chosen when the job is planned
+    selected_font = lyrics_font or pick_random_font()
+    print(f"DEBUG: Using lyrics font: {selected_font}")
+    use_random_caption = random_caption is not None
+    if use_random_caption:
+        caption_font = caption_font or pick_random_caption_font()
+        print(f"DEBUG: Using caption: '{random_caption}' with font: {caption_font}")
+
+    timings = {}
+    stage_start = time.perf_counter()
+    # Readers and the temp audio are released even if the render fails, so a
+    # long-running process doesn't leak ffmpeg subprocesses and temp files
+    clips = []
+    temp_audio_file = None
+    try:
+        background = VideoFileClip(background_path)
+        clips.append(background)
+        # Unique temp file so parallel renders don't clobber each other's audio
+        fd, temp_audio_file = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        audio_segment.export(temp_audio_file, format="mp3")
+        audio = AudioFileClip(temp_audio_file)
+        clips.append(audio)
+        duration = audio.duration
+
+        if background.duration < duration:
+            n_loops = int(np.ceil(duration / background.duration))
+            background = VideoFileClip(background_path).with_effects([vfx.Loop(n_loops)])
+            clips.append(background)
+
+        # Crop to 9:16 without stretching
+        w, h = background.size
+        target_w, target_h = int(VIDEO_SIZE[0] * ui_scale), int(VIDEO_SIZE[1] * ui_scale)
+        scale = target_h / h
+        new_w = int(w * scale)
+        new_h = int(h * scale)
+        background = background.resized((new_w, new_h))
+        if new_w > target_w:
+            x1 = (new_w - target_w) / 2
+            x2 = x1 + target_w
+            background = background.cropped(x1=x1, y1=0, x2=x2, y2=new_h)
+
+        # Get a start point for the background video, avoiding black frames,
+        # fades and cuts when the background has a quality index
+        if background_start is None:
+            random_start = pick_background_start(background_path, background.duration, duration, rng)
+        else:
+            # The clip may have been trimmed since the job was planned
+            random_start = min(background_start, max(0, background.duration - duration))
+
+        background = background.subclipped(random_start, random_start + duration)
+        # Make final video 9:16
+        background = background.resized((target_w, target_h))
+
+        background = background.with_audio(audio)
+        timings['load'] = time.perf_counter() - stage_start
+        stage_start = time.perf_counter()
+
+        text_clips = []
+
+        # Add random caption at the top if requested
+        if use_random_caption and random_caption:
+            try:
+                caption_clip = TextClip(
+                    text=random_caption,
+                    font_size=int(90 * ui_scale),
+                    font=caption_font,
+                    color='white',
+                    stroke_color='black',
+                    stroke_width=max(1, round(3 * ui_scale)),
+                    method='label',
+                    text_align='center'
+                )
+                # Position at top of screen with some padding
+                caption_clip = caption_clip.with_position(('center', int(150 * ui_scale))).with_duration(duration)
+                text_clips.append(caption_clip)
+            except Exception as e:
+                print(f"DEBUG: Caption font error with {caption_font}, falling back to Arial: {e}")
+                caption_clip = TextClip(
+                    text=random_caption,
+                    font_size=int(45 * ui_scale),
+                    font='Arial',
+                    color='white',
+                    stroke_color='black',
+                    stroke_width=max(1, round(3 * ui_scale)),
+                    method='label',
+                    text_align='center'
+                )
+                caption_clip = caption_clip.with_position(('center', int(150 * ui_scale))).with_duration(duration)
+                text_clips.append(caption_clip)
+
+        # Add lyrics in the center
+        for lyric in lyrics_data:
+            relative_start = max(0, lyric['start_time'] - segment_start_time)
+            relative_end = min(duration, lyric['end_time'] - segment_start_time)
+            if relative_end > relative_start and karaoke:
+                txt = make_karaoke_clip(
+                    lyric, segment_start_time, relative_start, relative_end,
+                    font=selected_font,
+                    font_size=int(75 * ui_scale),
+                    stroke_width=max(1, round(2 * ui_scale))
+                )
+                text_clips.append(txt.with_position(('center', 'center')))
+            elif relative_end > relative_start:
+                try:
+                    txt = TextClip(
+                        text=lyric['text'],
+                        font_size=int(75 * ui_scale),
+                        font=selected_font,
+                        color='white',
+                        stroke_color='black',
+                        stroke_width=max(1, round(2 * ui_scale)),
+                        method='label',
+                        text_align='center'
+                    )
+                    txt = txt.with_position(('center', 'center')).with_start(relative_start).with_end(relative_end)
+                    text_clips.append(txt)
+                except Exception as e:
+                    print(f"DEBUG: Font error with {selected_font}, falling back to Arial: {e}")
+                    txt = TextClip(
+                        text=lyric['text'],
+                        font_size=int(55 * ui_scale),
+                        font='Arial',
+                        color='white',
+                        stroke_color='black',
+                        stroke_width=max(1, round(2 * ui_scale)),
+                        method='label',
+                        text_align='center'
+                    )
+                    txt = txt.with_position(('center', 'center')).with_start(relative_start).with_end(relative_end)
+                    text_clips.append(txt)
+
+        final_clip = CompositeVideoClip([background] + text_clips, size=background.size)
+        clips.append(final_clip)
+        timings['compose'] = time.perf_counter() - stage_start
+        stage_start = time.perf_counter()
+
+        # Use detected GPU codec and parameters
+        final_clip.write_videofile(
+            output_path,
+            codec=video_codec,
+            audio_codec='aac',
+            write_logfile=False,
+            logger='bar',
+            ffmpeg_params=ffmpeg_params,
+            fps=fps,
+            threads=threads,
+            temp_audiofile_path=os.path.dirname(output_path)
+        )
+
+        timings['encode'] = time.perf_counter() - stage_start
+    finally:
+        for clip in clips:
+            clip.close()
+        if temp_audio_file and os.path.exists(temp_audio_file):
+            os.remove(temp_audio_file)
+    return timings
+
+def generate_datetime_filename(base_name):
+    """Generate filename with current date and time"""
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds for uniqueness
+    # Parallel workers can start within the same millisecond, so add a short tag
+    # (from os.urandom so seeded jobs don't disturb the random module's state)
+    return f"{base_name}_{timestamp}_{os.urandom(2).hex()}.mp4"
+
+def create_song_folder(song_base_name, root=OUTPUT_FOLDER):
+    """Create folder for specific song if it doesn't exist"""
+    song_folder = os.path.join(root, song_base_name)
+    os.makedirs(song_folder, exist_ok=True)
+    return song_folder
+
+def render_to_scratch(job, threads=1, draft=False):
+    """Render a planned Job into SCRATCH_FOLDER without finalizing it.
+
+    The returned result's ``output_path`` is the final destination and
+    ``scratch_path`` is where the finished video currently is. Never raises;
+    failures are reported on the result.
+    """
+    result = RenderResult(job=job, draft=draft)
+    render_start = time.perf_counter()
+    try:
+        # Hand-built jobs and older specs may not have a background start yet;
+        # fix it now so the draft spec records the frames that were rendered
+        job = result.job = resolve_background_start(job)
+        if job.output_dir:
+            os.makedirs(job.output_dir, exist_ok=True)
+            song_folder = job.output_dir
+        else:
+            song_folder = create_song_folder(job.base_name, DRAFTS_FOLDER if draft else OUTPUT_FOLDER)
+        output_filename = generate_datetime_filename(job.base_name)
+        output_path = os.path.join(song_folder, output_filename)
+
+        # Keep the .mp4 extension last so ffmpeg can still infer the container
+        os.makedirs(SCRATCH_FOLDER, exist_ok=True)
+        result.scratch_path = os.path.join(SCRATCH_FOLDER, os.path.splitext(output_filename)[0] + PARTIAL_SUFFIX + ".mp4")
+
+        stage_start = time.perf_counter()
+        audio_segment = load_segment_audio(job.audio_path, job.start_time, job.end_time)
+        result.timings['audio'] = time.perf_counter() - stage_start
+
+        result.timings.update(create_video(
+            background_path=os.path.join(BACKGROUNDS_FOLDER, job.background),
+            audio_segment=audio_segment,
+            lyrics_data=job.segment_lyrics,
+            output_path=result.scratch_path,
+            segment_start_time=job.start_time,
+            threads=threads,
+            lyrics_font=job.lyrics_font,
+            random_caption=job.caption,
+            caption_font=job.caption_font,
+            rng=random.Random(job.seed) if job.seed is not None else None,
+            draft=draft,
+            karaoke=job.karaoke,
+            background_start=job.background_start
+        ))
+        result.output_path = output_path
+        if draft:
+            # Only successful drafts get a spec, so --promote never picks up a failed one
+            result.spec_path = os.path.splitext(output_path)[0] + ".json"
+            save_job(job, result.spec_path)
+    except Exception as e:
+        print(f"DEBUG: render failed for {job.base_name}:\n{traceback.format_exc()}")
+        result.error = f"{type(e).__name__}: {e}"
+        discard_scratch(result)
+        discard_spec(result)
+    result.timings['total'] = time.perf_counter() - render_start
+    return result
+
+def discard_scratch(result):
+    """Remove a scratch render along with any temp audio moviepy left next to it"""
+    if not result.scratch_path:
+        return
+    stem = os.path.splitext(result.scratch_path)[0]
+    for path in [result.scratch_path] + glob.glob(glob.escape(stem) + "TEMP_MPY_wvf_snd*"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def discard_spec(result):
+    """Remove the saved job spec of a draft whose video never made it to its destination"""
+    if result.spec_path and os.path.exists(result.spec_path):
+        os.remove(result.spec_path)
+    result.spec_path = None
+
+def _finish(result, offloader=None):
+    """Move a scratch render to its destination, in the background if an offloader is given"""
+    if not result.ok:
+        return None
+    if offloader is not None:
+        return offloader.submit(result.scratch_path, result.output_path, result)
+
+    stage_start = time.perf_counter()
+    try:
+        finalize_output(result.scratch_path, result.output_path)
+    except Exception as e:
+        result.error = f"finalize failed: {type(e).__name__}: {e}"
+        result.output_path = None
+        discard_scratch(result)
+        discard_spec(result)
+    result.timings['finalize'] = time.perf_counter() - stage_start
+    result.timings['total'] += result.timings['finalize']
+    return None
+
+def _pool_failure(job, draft, error):
+    """Result for a job the worker pool could not run at all"""
+    print(f"DEBUG: worker failed for {job.base_name}: {type(error).__name__}: {error}")
+    result = RenderResult(job=job, draft=draft, error=f"{type(error).__name__}: {error}")
+    result.timings['total'] = 0.0
+    return result
+
+def render(job, threads=1, draft=False, offloader=None):
+    """Render a planned Job and finalize it at its destination. Never raises.
+
+    Drafts also save the job spec next to the video so an approved draft can be
+    promoted to a full-quality render of exactly the same job. With an
+    OutputOffloader the copy to the destination happens in the background and
+    ``output_path`` only appears there once it is complete.
+    """
+    result = render_to_scratch(job, threads, draft)
+    _finish(result, offloader)
+    return result
+
+def render_many(jobs, workers=1, threads=1, draft=False, offloader=None, copy_workers=2, history=HISTORY_FILE):
+    """Render several jobs, in-process or across a pool of worker processes.
+
+    Jobs are submitted longest-predicted-first according to a cost model fitted
+    on ``history`` (pass None to neither use nor extend it), so one slow job
+    doesn't end up running alone at the end of a parallel batch.
+
+    Finished videos are handed to an OutputOffloader (a private one with
+    ``copy_workers`` threads unless one is passed in) so the next render starts
+    while the previous file is still being copied. Returns once every copy in
+    this batch is done; results come back in the same order as ``jobs``.
+    """
+    jobs = list(jobs)
+    encoder = DRAFT_CODEC[0] if draft else detect_gpu_codec()[0]
+    features = [job_features(job, encoder, draft) for job in jobs]
+    model = CostModel.from_history(history) if history else CostModel()
+    schedule = plan_schedule([model.predict(f) for f in features], workers, model.fitted)
+
+    own_offloader = offloader is None
+    if own_offloader:
+        offloader = OutputOffloader(max_workers=copy_workers, max_pending=2 * copy_workers)
+
+    results = [None] * len(jobs)
+    copies = []
+    batch_start = time.perf_counter()
+    try:
+        if workers <= 1 or len(jobs) <= 1:
+            for i, job in enumerate(jobs):
+                results[i] = render_to_scratch(job, threads, draft)
+                copies.append(_finish(results[i], offloader))
+        else:
+            from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Only keep a few renders ahead of the offloader: _finish blocks while
+                # it is full, and nothing new is submitted until it returns
+                order = iter(schedule.order)
+                pending = {}
+
+                def submit_next():
+                    for i in order:
+                        try:
+                            pending[executor.submit(render_to_scratch, jobs[i], threads, draft)] = i
+                            return
+                        except Exception as e:
+                            # The pool is already broken, e.g. a worker was killed
+                            results[i] = _pool_failure(jobs[i], draft, e)
+
+                for _ in range(workers + offloader.max_pending):
+                    submit_next()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = pending.pop(future)
+                        try:
+                            results[i] = future.result()
+                        except Exception as e:
+                            # render_to_scratch never raises, so this is the pool itself,
+                            # e.g. a worker killed for running out of memory
+                            results[i] = _pool_failure(jobs[i], draft, e)
+                        copies.append(_finish(results[i], offloader))
+                        submit_next()
+        makespan = time.perf_counter() - batch_start
+
+        for copy in copies:
+            if copy is not None:
+                copy.exception()  # wait; failures are already recorded on the result
+    finally:
+        if own_offloader:
+            offloader.close()
+
+    for result, predicted in zip(results, schedule.predictions):
+        result.predicted_seconds = predicted
+    if jobs and schedule.fitted:
+        print(f"DEBUG: predicted makespan {schedule.predicted_makespan:.1f}s, actual {makespan:.1f}s on {max(1, workers)} workers")
+    elif jobs:
+        print(f"DEBUG: batch took {makespan:.1f}s on {max(1, workers)} workers (no prediction until {MIN_HISTORY} renders are in the history)")
+    if history and jobs:
+        record_history(results, features, history)
+    return results